@@ -14,135 +14,315 @@ License: MIT
 
 from __future__ import annotations
 import os
+import io
 import sys
 import csv
+import atexit
+import mmap
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Dict
-from collections import defaultdict
+from typing import List, Tuple, Dict, Callable, Iterable, Iterator, TypeVar
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from colorama import init as colorama_init, Fore, Style
 
-# Initialize colorama for cross-platform colored output
-colorama_init(autoreset=True)
-
 class AnsiFore:
     GRAY = "\033[90m"
     RESET = "\033[0m"
 
+# Colors only when attached to a terminal; piped/redirected output gets plain
+# text and skips colorama's stream wrapper altogether
+USE_COLOR = sys.stdout is not None and sys.stdout.isatty()
+if USE_COLOR:
+    # Initialize colorama for cross-platform colored output
+    colorama_init(autoreset=True)
+
+C_BLUE = Fore.BLUE if USE_COLOR else ""
+C_CYAN = Fore.CYAN if USE_COLOR else ""
+C_GRAY = AnsiFore.GRAY if USE_COLOR else ""
+C_GREEN = Fore.GREEN if USE_COLOR else ""
+C_MAGENTA = Fore.MAGENTA if USE_COLOR else ""
+C_RED = Fore.RED if USE_COLOR else ""
+C_YELLOW = Fore.YELLOW if USE_COLOR else ""
+C_RESET = Style.RESET_ALL if USE_COLOR else ""
+
+# Append-only descriptors for rename_log.csv files, kept open per log path
+LOG_FDS: Dict[Path, int] = {}
+# Windows will not delete a log (or rename/delete its folder) while a
+# descriptor is open, so there it is closed after every batch
+KEEP_LOG_OPEN = os.name != "nt"
+# Characters of formatted log rows to collect before each os.write()
+LOG_BUFFER_SIZE = 1 << 20
+
+# Thread pool sizing for stat/rename calls (the GIL is released around them)
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Below this many files the pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 64
+# Most folder descriptors held at once for dir_fd renames (stays well
+# under low open-file limits); other folders rename by full path
+DIR_FD_LIMIT = 32
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Per-file output lines collected before one sys.stdout.write()
+PRINT_BATCH = 64
+
 # ---------------------------
 # Utility helpers
 # ---------------------------
+# ASCII banner + credits & usage hint, pre-joined so it is written in one call
+BANNER = "".join([
+    C_CYAN + "                 .d8888b.  888                                                 " + C_RESET + "\n",
+    C_CYAN + "                d88P  Y88b 888                                                 " + C_RESET + "\n",
+    C_CYAN + "                888    888 888                                                 " + C_RESET + "\n",
+    C_CYAN + "888d888 .d88b.  888        88888b.  888d888 .d88b.  88888b.   .d88b.  .d8888b  " + C_RESET + "\n",
+    C_CYAN + "888P'  d8P  Y8b 888        888 '88b 888P'  d88''88b 888 '88b d88''88b 88K      " + C_RESET + "\n",
+    C_CYAN + "888    88888888 888    888 888  888 888    888  888 888  888 888  888 'Y8888b. " + C_RESET + "\n",
+    C_CYAN + "888    Y8b.     Y88b  d88P 888  888 888    Y88..88P 888  888 Y88..88P      X88 " + C_RESET + "\n",
+    C_CYAN + "888     'Y8888   'Y8888P'  888  888 888     'Y88P'  888  888  'Y88P'   88888P' v0.9.2" + C_RESET + "\n",
+    "\n",
+    C_GRAY + "reChronos v0.9.2 - The Metadata-aware File Renamer ( preview | rename | rollback )" + C_RESET + "\n",
+    C_GRAY + "Author: Duc Nguyen | GitHub: github.com/nminhducit/reChronos" + C_RESET + "\n",
+    C_YELLOW + "Type 'help' to see available commands." + C_RESET + "\n",
+    "\n",
+])
+
+
 def banner() -> None:
     """Print ASCII banner + credits & usage hint in color."""
-    print(Fore.CYAN + "                 .d8888b.  888                                                 ")
-    print(Fore.CYAN + "                d88P  Y88b 888                                                 ")
-    print(Fore.CYAN + "                888    888 888                                                 ")
-    print(Fore.CYAN + "888d888 .d88b.  888        88888b.  888d888 .d88b.  88888b.   .d88b.  .d8888b  ")
-    print(Fore.CYAN + "888P'  d8P  Y8b 888        888 '88b 888P'  d88''88b 888 '88b d88''88b 88K      ")
-    print(Fore.CYAN + "888    88888888 888    888 888  888 888    888  888 888  888 888  888 'Y8888b. ")
-    print(Fore.CYAN + "888    Y8b.     Y88b  d88P 888  888 888    Y88..88P 888  888 Y88..88P      X88 ")
-    print(Fore.CYAN + "888     'Y8888   'Y8888P'  888  888 888     'Y88P'  888  888  'Y88P'   88888P' v0.9.2")
-    print()
-    print(AnsiFore.GRAY + "reChronos v0.9.2 - The Metadata-aware File Renamer ( preview | rename | rollback )")
-    print(AnsiFore.GRAY + "Author: Duc Nguyen | GitHub: github.com/nminhducit/reChronos")
-    print(Fore.YELLOW + "Type 'help' to see available commands.")
-    print()
+    sys.stdout.write(BANNER)
 
 
 # ---------------------------
 # Core helpers
 # ---------------------------
-def human_ampm(dt: datetime) -> str:
+def flush_lines(lines: List[str]) -> None:
     """
-    Format datetime to YYMMDD_HHMMAMPM (e.g. 250930_1130PM).
+    Write collected output lines to stdout in one call and clear the list.
+    Lines must end with their own newline (and C_RESET if colored,
+    since colorama only auto-resets at the end of each write).
     
     Args:
-        dt: datetime object to format
-    Returns:
-        Formatted string in YYMMDD_HHMMAMPM format
+        lines: Output lines to write
     """
-    date_part = dt.strftime("%y%m%d")
-    time_part = dt.strftime("%I%M%p")
-    return f"{date_part}_{time_part}"
+    if lines:
+        sys.stdout.write("".join(lines))
+        lines.clear()
 
 
-def get_file_datetime(path: Path) -> datetime:
+def map_io(func: Callable[[T], R], items: Iterable[T]) -> List[R]:
     """
-    Get the OLDEST datetime for the file (closest to when photo was taken).
-    Compares creation time and modification time, returns the earlier one.
+    Apply an I/O-bound function to every item, results in input order.
+    Large batches run on a thread pool so filesystem round-trips overlap
+    (helps most on network drives); small ones stay serial.
     
     Args:
-        path: Path object of the file
+        func: Function to call per item
+        items: Items to process
     Returns:
-        datetime object of the oldest timestamp
+        List of results in the same order as items
+    """
+    return list(imap_io(func, items))
+
+
+def imap_io(func: Callable[[T], R], items: Iterable[T]) -> Iterator[R]:
+    """
+    Lazy map_io: yield each result, in input order, as soon as it is ready.
+    Closing the iterator early cancels the calls that have not started and
+    waits for the running ones.
+    
+    Args:
+        func: Function to call per item
+        items: Items to process
+    Yields:
+        Results in the same order as items
+    """
+    items = list(items)
+    if len(items) < PARALLEL_MIN_FILES:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+        yield from executor.map(func, items)
+
+
+# Pick how to read creation time once, at import, instead of per file
+if sys.platform.startswith("win"):
+    def oldest_timestamp(stat: os.stat_result) -> float:
+        """Oldest of creation and modification time (Windows: st_ctime is creation time)."""
+        return min(stat.st_ctime, stat.st_mtime)
+elif hasattr(os.stat_result, "st_birthtime"):
+    def oldest_timestamp(stat: os.stat_result) -> float:
+        """Oldest of creation and modification time (macOS/BSD: st_birthtime)."""
+        return min(stat.st_birthtime, stat.st_mtime)
+else:
+    def oldest_timestamp(stat: os.stat_result) -> float:
+        """Oldest of creation and modification time (Linux and others without birth time: st_ctime)."""
+        return min(stat.st_ctime, stat.st_mtime)
+
+
+def format_oldest(stat: os.stat_result) -> str:
     """
-    stat = path.stat()
+    Format the OLDEST timestamp of a file (closest to when photo was taken)
+    as YYMMDD_HHMMAMPM (e.g. 250930_1130PM).
+    Compares creation time and modification time and uses the earlier one,
+    going straight from epoch seconds to text via time.localtime().
     
-    # Get modification time
-    mtime = stat.st_mtime
+    Args:
+        stat: stat result of the file (as returned by the directory walk)
+    Returns:
+        Formatted string in YYMMDD_HHMMAMPM format
+    """
+    # Use the OLDEST time (minimum of creation and modification)
+    tm = time.localtime(oldest_timestamp(stat))
     
-    # Get creation time (platform dependent)
-    # On Windows: st_ctime is creation time
-    # On Unix/Mac: try st_birthtime first, fallback to st_ctime
-    if sys.platform.startswith("win"):
-        ctime = stat.st_ctime
-    else:
-        ctime = getattr(stat, 'st_birthtime', stat.st_ctime)
+    # Format the integer fields directly: no strftime format parsing or locale lookup
+    h = tm.tm_hour
+    ampm = "AM" if h < 12 else "PM"
+    h12 = h % 12 or 12
+    return f"{tm.tm_year % 100:02d}{tm.tm_mon:02d}{tm.tm_mday:02d}_{h12:02d}{tm.tm_min:02d}{ampm}"
+
+
+@lru_cache(maxsize=256)
+def name_suffix(name: str) -> str:
+    """
+    Return the suffix of a file name by Path.suffix's rule, without a Path.
+    Unlike os.path.splitext, leading dots do not hide it ("..jpg" -> ".jpg").
     
-    # Return the OLDEST time (minimum of creation and modification)
-    oldest_timestamp = min(ctime, mtime)
-    return datetime.fromtimestamp(oldest_timestamp)
+    Args:
+        name: File name (no directory part)
+    Returns:
+        Suffix including the dot, or "" if none
+    """
+    i = name.rfind(".")
+    return name[i:] if 0 < i < len(name) - 1 else ""
 
 
-def make_new_name(original: Path, dt: datetime, existing_names: set) -> Path:
+def ext_parts(suffix: str) -> Tuple[str, str]:
     """
-    Build a new name like EXT_YYMMDD_HHMMAMPM.ext ensuring no collision.
-    If collision occurs, append _1, _2, etc.
+    Split a file suffix into the name prefix and final extension.
+    Cached, since a tree usually holds only a handful of distinct suffixes.
     
     Args:
-        original: Original file path
-        dt: datetime to use for naming
-        existing_names: Set of already used names to avoid collision
+        suffix: File suffix including the dot (e.g. ".JPG"), or "" if none
     Returns:
-        Path object with new filename
+        Tuple (prefix, final_ext), e.g. ("JPG", ".jpg") or ("FILE", "")
     """
     # Extract extension (without dot) or use 'FILE' if no extension
-    ext = original.suffix[1:] if original.suffix else ""
+    ext = suffix[1:] if suffix else ""
     prefix = ext.upper() if ext else "FILE"
     
     # Use lowercase extension for final filename
     final_ext = f".{ext.lower()}" if ext else ""
+    return prefix, final_ext
+
+
+def make_new_name(suffix: str, stamp: str, existing_names: set,
+                  next_index: Dict[str, int]) -> str:
+    """
+    Build a new name like EXT_YYMMDD_HHMMAMPM.ext ensuring no collision.
+    If collision occurs, append _1, _2, etc.
+    
+    Args:
+        suffix: Original file suffix including the dot, or "" if none
+        stamp: Formatted timestamp (YYMMDD_HHMMAMPM) to use for naming
+        existing_names: Set of already used names to avoid collision
+        next_index: Next suffix to try per unsuffixed name (same directory), so
+            a burst of files sharing one minute does not re-probe _1.._k each time
+    Returns:
+        New filename
+    """
+    # Name prefix (upper-case extension or 'FILE') and lower-case extension
+    prefix, final_ext = ext_parts(suffix)
     
     # Build base name
-    base = f"{prefix}_{human_ampm(dt)}"
-    candidate = base + final_ext
+    base = f"{prefix}_{stamp}"
+    unsuffixed = candidate = base + final_ext
     
-    # Handle collision: append _1, _2, _3... until unique name found
-    i = 1
+    # Handle collision: append _1, _2, _3... resuming after the last suffix used.
+    # Keyed by the full name: "FILE_..." and "FILE_....file" share a base
+    i = next_index.get(unsuffixed, 1)
     while candidate in existing_names:
         candidate = f"{base}_{i}{final_ext}"
         i += 1
     
-    # Reserve this name in the set
+    # Reserve this name in the set and remember where to resume
     existing_names.add(candidate)
-    return Path(candidate)
+    next_index[unsuffixed] = i
+    return candidate
 
 
-def gather_files_recursive(root: Path) -> List[Path]:
+def stat_entry(entry: os.DirEntry) -> os.stat_result | None:
+    """
+    Stat a directory entry, following symlinks like Path.stat().
+    
+    Args:
+        entry: DirEntry from os.scandir
+    Returns:
+        stat result, or None if the file vanished or cannot be read
+    """
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+
+def gather_files_recursive(root: Path) -> Tuple[List[Tuple[str, os.stat_result]], Dict[str, set]]:
     """
     Recursively gather all files under root directory.
     Excludes the log file itself to avoid renaming it.
+    Walks with os.scandir so file/dir checks reuse the readdir entry type
+    instead of issuing a stat() per entry, and returns the entry's stat
+    result so callers do not stat each file a second time.
+    Also records every file name seen per directory (log included), so
+    collision checks need no second listing of each directory.
     
     Args:
         root: Root directory path
     Returns:
-        List of file paths
+        Tuple of (list of (file path string, stat result), file names per
+        directory keyed by the directory's path string)
     """
     log_name = "rename_log.csv"
-    # Use rglob("*") to recursively find all files
-    # Filter: only files (not dirs) and not the log file
-    return [p for p in root.rglob("*") if p.is_file() and p.name != log_name]
+    file_entries: List[os.DirEntry] = []
+    names_by_dir: Dict[str, set] = {}
+    pending = deque([str(root)])
+
+    # Breadth-first walk; symlinked directories are not followed (like rglob)
+    while pending:
+        current = pending.popleft()
+        # Registered up front: files kept from a listing that fails midway still have a set
+        names = names_by_dir[current] = set()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        # Symlink loop or unreadable entry: not a file (as Path.is_file())
+                        continue
+                    names.add(entry.name)
+                    if entry.name != log_name:
+                        file_entries.append(entry)
+        except OSError:
+            # Unreadable directory (or listing cut short): skip the rest as rglob does
+            continue
+
+    # Stat all files (threaded for large trees); vanished/unreadable ones are left out
+    stats = map_io(stat_entry, file_entries)
+
+    # Plain strings throughout: no Path object per file
+    files = [(entry.path, st) for entry, st in zip(file_entries, stats) if st is not None]
+    return files, names_by_dir
 
 
 def ensure_dir_exists(p: Path) -> None:
@@ -157,45 +337,129 @@ def ensure_dir_exists(p: Path) -> None:
         p.mkdir(parents=True, exist_ok=True)
 
 
+def try_rename(src: str, dst: str, dir_fd: int | None = None) -> Exception | None:
+    """
+    Rename src to dst, returning the error instead of raising it.
+    
+    Args:
+        src: Current file path
+        dst: New file path
+        dir_fd: Descriptor of the folder holding both files; when given,
+            only the names are resolved (relative to it) by the kernel
+    Returns:
+        None on success, otherwise the exception raised
+    """
+    try:
+        if dir_fd is None:
+            os.rename(src, dst)
+        else:
+            os.rename(os.path.basename(src), os.path.basename(dst), src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+        return None
+    except Exception as e:
+        return e
+
+
+def open_dir_fds(dirs: Iterable[str]) -> Dict[str, int]:
+    """
+    Open each directory once for *at()-style renames (os.rename with dir_fd).
+    Only the DIR_FD_LIMIT directories with the most renames are opened;
+    returns nothing where dir_fd is unsupported (e.g. Windows). Directories
+    left out (or that fail to open) rename by full path.
+    
+    Args:
+        dirs: Directory of each rename (repeats count towards its share)
+    Returns:
+        Dict of directory -> open descriptor (caller closes them)
+    """
+    fds: Dict[str, int] = {}
+    if os.rename not in os.supports_dir_fd:
+        return fds
+    
+    flags = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+    for directory, _ in Counter(dirs).most_common(DIR_FD_LIMIT):
+        try:
+            fds[directory] = os.open(directory, flags)
+        except OSError:
+            continue
+    return fds
+
+
+def list_dir_names(directory: str | Path) -> set:
+    """
+    List entry names of a directory in one scandir pass.
+    Used to probe collision candidates in memory instead of stat-ing each one.
+    Names are casefolded so probes (which must casefold too) treat "A.JPG"
+    and "a.jpg" as one name, as case-insensitive volumes (NTFS, APFS,
+    FAT/exFAT cards) do; on case-sensitive ones this only skips a suffix.
+    
+    Args:
+        directory: Directory to list
+    Returns:
+        Set of casefolded entry names (empty if the directory cannot be read)
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name.casefold() for entry in entries}
+    except OSError:
+        return set()
+
+
 # ---------------------------
 # Core rename operations
 # ---------------------------
-def build_rename_plan(root: Path) -> List[Tuple[Path, Path]]:
+def build_rename_plan(root: Path) -> List[Tuple[str, str]]:
     """
     Build complete rename plan for all files under root.
+    Paths in the plan are absolute strings, so they can be renamed and
+    logged as-is without building a Path per file.
     
     Args:
         root: Root directory to scan
     Returns:
         List of tuples (old_path, new_path)
     """
-    files = gather_files_recursive(root)
-    plan: List[Tuple[Path, Path]] = []
+    # Anchor once (no filesystem walk, unlike resolve()) so every planned path is absolute
+    root = root.absolute()
+    
+    # Single walk: files with their stat results, plus current names per directory
+    files, existing_by_dir = gather_files_recursive(root)
+    plan: List[Tuple[str, str]] = []
     
-    # Track existing names per directory to avoid collisions
-    existing_by_dir: Dict[Path, set] = defaultdict(set)
+    # Track next collision suffix per directory (only directories with collisions get one)
+    next_index_by_dir: Dict[str, Dict[str, int]] = {}
+
+    # First pass (no disk access): parent, suffix, timestamp and unsuffixed target name per file
+    named: List[Tuple[str, str, str, str, str]] = []
+    for file_path, st in files:
+        parent_dir, name = os.path.split(file_path)
+        suffix = name_suffix(name)
+        stamp = format_oldest(st)
+        prefix, final_ext = ext_parts(suffix)
+        named.append((file_path, parent_dir, suffix, stamp, f"{prefix}_{stamp}{final_ext}"))
+    
+    # How many files in each directory want the same target name
+    wanted = Counter((parent_dir, candidate) for _, parent_dir, _, _, candidate in named)
 
     # Loop through each file and generate new name
-    for file_path in files:
-        parent_dir = file_path.parent
-        
-        # Initialize set of existing names for this directory if not done
-        if parent_dir not in existing_by_dir:
-            # Get all current filenames in this directory
-            existing_by_dir[parent_dir] = {p.name for p in parent_dir.iterdir() if p.is_file()}
+    for file_path, parent_dir, suffix, stamp, candidate in named:
+        existing = existing_by_dir.setdefault(parent_dir, set())
         
-        # Get file datetime and generate new name
-        dt = get_file_datetime(file_path)
-        new_name = make_new_name(file_path, dt, existing_by_dir[parent_dir])
-        new_full = parent_dir / new_name
+        # Only names wanted twice or already on disk need collision handling
+        if wanted[(parent_dir, candidate)] == 1 and candidate not in existing:
+            existing.add(candidate)
+            new_name = candidate
+        else:
+            if parent_dir not in next_index_by_dir:
+                next_index_by_dir[parent_dir] = {}
+            new_name = make_new_name(suffix, stamp, existing, next_index_by_dir[parent_dir])
         
         # Add to plan
-        plan.append((file_path, new_full))
+        plan.append((file_path, os.path.join(parent_dir, new_name)))
     
     return plan
 
 
-def preview_plan(plan: List[Tuple[Path, Path]], max_show: int = 10) -> None:
+def preview_plan(plan: List[Tuple[str, str]], max_show: int = 10) -> None:
     """
     Display preview of rename plan with summary.
     
@@ -205,9 +469,10 @@ def preview_plan(plan: List[Tuple[Path, Path]], max_show: int = 10) -> None:
     """
     total = len(plan)
     
-    # Show first N planned renames
-    for i, (old_path, new_path) in enumerate(plan[:max_show], start=1):
-        print(f"{i}. {old_path.name} → {Fore.GREEN}{new_path.name}{Style.RESET_ALL}")
+    # Show first N planned renames in one write
+    lines = [f"{i}. {os.path.basename(old_path)} → {C_GREEN}{os.path.basename(new_path)}{C_RESET}\n"
+             for i, (old_path, new_path) in enumerate(plan[:max_show], start=1)]
+    flush_lines(lines)
     
     # If more files than shown, print summary
     if total > max_show:
@@ -216,34 +481,134 @@ def preview_plan(plan: List[Tuple[Path, Path]], max_show: int = 10) -> None:
     print(f"Total files planned: {total}\n")
 
 
-def append_log_csv(log_path: Path, rows: List[List[str]]) -> None:
+class LogWriter:
     """
-    Append operations to CSV log file with UTF-8 encoding.
+    csv.writer-like sink for log rows: rows are CSV-formatted into memory
+    and appended to the log descriptor with os.write once LOG_BUFFER_SIZE
+    characters have built up (and on flush).
+    """
+
+    def __init__(self, fd: int) -> None:
+        """
+        Start an empty row buffer for a log descriptor.
+        
+        Args:
+            fd: Open append-only log descriptor (not closed by the writer)
+        """
+        self.fd = fd
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def writerow(self, row: List[str]) -> None:
+        """
+        Format one row into the buffer, writing the buffer out once it is full.
+        Until then (or until flush() runs) the row is not on disk.
+        
+        Args:
+            row: Log row [batch_id, timestamp, src, dst, action]
+        """
+        self.writer.writerow(row)
+        if self.buffer.tell() >= LOG_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Append all buffered rows to the log and empty the buffer.
+        os.write may accept only part of the data, so it is called in a loop
+        until every byte is out.
+        """
+        data = memoryview(self.buffer.getvalue().encode("utf-8"))
+        # os.write may write less than asked; loop until everything is out
+        while data:
+            data = data[os.write(self.fd, data):]
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+
+def log_fd(log_path: Path) -> int:
+    """
+    Return the cached append-only descriptor for a log file, opening it on
+    first use (or if the file was deleted/replaced since).
     Creates file with header if it doesn't exist.
     
     Args:
         log_path: Path to log CSV file
-        rows: List of rows to append [batch_id, timestamp, src, dst, action]
+    Returns:
+        OS file descriptor opened with O_APPEND
     """
-    header = ["batch_id", "timestamp", "src", "dst", "action"]
-    exists = log_path.exists()
+    fd = LOG_FDS.get(log_path)
+    if fd is not None:
+        # Reuse only if the path still points at the file we hold open
+        try:
+            held, current = os.fstat(fd), os.stat(log_path)
+            if (held.st_dev, held.st_ino) == (current.st_dev, current.st_ino):
+                return fd
+        except OSError:
+            pass
+        close_log(log_path)
     
     # Ensure parent directory exists
     ensure_dir_exists(log_path.parent)
     
-    # Open in append mode with UTF-8-BOM for Excel compatibility
-    with log_path.open("a", newline="", encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        
-        # Write header if file is new
-        if not exists:
-            writer.writerow(header)
-        
-        # Write all rows
-        writer.writerows(rows)
+    # O_BINARY keeps Windows from translating the CSV's \r\n line endings
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+    fd = os.open(log_path, flags, 0o644)
+    
+    # Write header if file is new, with UTF-8-BOM for Excel compatibility
+    if os.fstat(fd).st_size == 0:
+        header = io.StringIO()
+        csv.writer(header).writerow(["batch_id", "timestamp", "src", "dst", "action"])
+        os.write(fd, header.getvalue().encode("utf-8-sig"))
+    
+    LOG_FDS[log_path] = fd
+    return fd
 
 
-def perform_rename(root: Path, plan: List[Tuple[Path, Path]]) -> None:
+def close_log(log_path: Path) -> None:
+    """
+    Close the cached descriptor for a log file, if any.
+    
+    Args:
+        log_path: Path to log CSV file
+    """
+    fd = LOG_FDS.pop(log_path, None)
+    if fd is not None:
+        os.close(fd)
+
+
+@atexit.register
+def close_all_logs() -> None:
+    """Close every cached log descriptor (runs at interpreter exit)."""
+    for log_path in list(LOG_FDS):
+        close_log(log_path)
+
+
+@contextmanager
+def open_log(log_path: Path) -> Iterator[LogWriter]:
+    """
+    Yield a writer that appends rows to the CSV log.
+    The log's descriptor is opened once per path and kept for the session
+    (except on Windows, see KEEP_LOG_OPEN), so repeated batches skip the
+    open() path lookup; rows are buffered and always flushed when the
+    block exits.
+    
+    Args:
+        log_path: Path to log CSV file
+    Yields:
+        LogWriter for rows [batch_id, timestamp, src, dst, action]
+    """
+    writer = LogWriter(log_fd(log_path))
+    try:
+        yield writer
+    finally:
+        try:
+            writer.flush()
+        finally:
+            if not KEEP_LOG_OPEN:
+                close_log(log_path)
+
+
+def perform_rename(root: Path, plan: List[Tuple[str, str]]) -> None:
     """
     Execute rename operations and log to CSV.
     Each execution gets a unique batch_id for rollback tracking.
@@ -256,74 +621,134 @@ def perform_rename(root: Path, plan: List[Tuple[Path, Path]]) -> None:
     batch_id = datetime.now().strftime("%Y%m%d%H%M%S")
     timestamp = datetime.now().isoformat()
     log_path = root / "rename_log.csv"
-    rows = []
-
-    # Process each planned rename
-    for src, dst in plan:
-        # Check if source file still exists
-        if not src.exists():
-            rows.append([batch_id, timestamp, str(src.resolve()), str(dst.resolve()), "skip_missing_src"])
-            print(Fore.YELLOW + f"Skipped missing source: {src}")
-            continue
+    success_count = 0
+
+    # Names taken per directory (casefolded, see list_dir_names): planned
+    # targets, plus disk listing once a conflict shows up
+    used: Dict[str, set] = defaultdict(set)
+    for _, dst in plan:
+        dst_dir, dst_name = os.path.split(dst)
+        used[dst_dir].add(dst_name.casefold())
+    listed_dirs = set()
+    lines: List[str] = []
+
+    # Keep the log open for the whole batch and write each row as it is known
+    with open_log(log_path) as log:
+        # Check every source and target up front (threaded for large plans)
+        checks = map_io(lambda pair: (os.path.exists(pair[0]), os.path.exists(pair[1])), plan)
+        jobs: List[Tuple[str, str]] = []
+
+        # Resolve final targets serially so conflict suffixes stay deterministic
+        for (src, dst), (src_exists, dst_exists) in zip(plan, checks):
+            if len(lines) >= PRINT_BATCH:
+                flush_lines(lines)
+
+            # Check if source file still exists
+            if not src_exists:
+                log.writerow([batch_id, timestamp, src, dst, "skip_missing_src"])
+                lines.append(C_YELLOW + f"Skipped missing source: {src}{C_RESET}\n")
+                continue
+
+            target_dst = dst
+            src_dir = os.path.dirname(src)
+            dst_dir, dst_name = os.path.split(dst)
+
+            # Handle collision: if destination exists and is different file
+            if dst_exists and os.path.realpath(dst) != os.path.realpath(src):
+                base, ext = os.path.splitext(dst_name)
+                names = used[dst_dir]
+
+                # List the directory once so candidates are probed in memory
+                if dst_dir not in listed_dirs:
+                    names.update(list_dir_names(dst_dir))
+                    listed_dirs.add(dst_dir)
+
+                # Find non-conflicting name by appending _1, _2...
+                i = 1
+                while f"{base}_{i}{ext}".casefold() in names:
+                    i += 1
+                new_name = f"{base}_{i}{ext}"
+                names.add(new_name.casefold())
+                target_dst = os.path.join(dst_dir, new_name)
+
+                lines.append(C_YELLOW + f"Conflict: {dst_name} exists — renaming to {new_name}{C_RESET}\n")
 
-        target_dst = dst
+            # Plan targets stay in the source folder; only create other parents
+            if dst_dir != src_dir:
+                ensure_dir_exists(Path(dst_dir))
+
+            jobs.append((src, target_dst))
+
+        # Open the busiest source folders once (capped); renames inside them then resolve only the file names
+        dir_fds = open_dir_fds(os.path.dirname(src) for src, target_dst in jobs
+                               if os.path.dirname(src) == os.path.dirname(target_dst))
         
-        # Handle collision: if destination exists and is different file
-        if target_dst.exists() and target_dst.resolve() != src.resolve():
-            base = target_dst.stem
-            ext = target_dst.suffix
-            i = 1
-            
-            # Find non-conflicting name by appending _1, _2...
-            while True:
-                new_candidate = target_dst.with_name(f"{base}_{i}{ext}")
-                # Break when unique name found
-                if not new_candidate.exists():
-                    target_dst = new_candidate
-                    break
-                i += 1
-            
-            print(Fore.YELLOW + f"Conflict: {dst.name} exists — renaming to {target_dst.name}")
+        # Rename files (same filesystem, so no shutil.move copy fallback); results keep plan order
+        def rename_job(job: Tuple[str, str]) -> Exception | None:
+            src, dst = job
+            src_dir = os.path.dirname(src)
+            dir_fd = dir_fds.get(src_dir) if src_dir == os.path.dirname(dst) else None
+            return try_rename(src, dst, dir_fd)
 
-        # Ensure destination directory exists
-        ensure_dir_exists(target_dst.parent)
+        flush_lines(lines)
 
-        # Attempt to move/rename file
+        # Log each result as it arrives so an interrupted batch keeps its rows
+        results = imap_io(rename_job, jobs)
+        logged = 0
         try:
-            shutil.move(str(src), str(target_dst))
-            # Log successful rename with absolute paths
-            rows.append([batch_id, timestamp, str(src.resolve()), str(target_dst.resolve()), "rename"])
-            print(f"  {src.name} → {Fore.GREEN}{target_dst.name}{Style.RESET_ALL}")
-        except Exception as e:
-            # Log error if rename fails
-            rows.append([batch_id, timestamp, str(src.resolve()), str(target_dst.resolve()), f"error:{e}"])
-            print(Fore.RED + f"Error renaming {src.name}: {e}")
+            for (src, target_dst), e in zip(jobs, results):
+                if len(lines) >= PRINT_BATCH:
+                    flush_lines(lines)
 
-    # Save all operations to log
-    append_log_csv(log_path, rows)
-    
-    # Count successful renames
-    success_count = len([r for r in rows if r[4] == 'rename'])
-    print(Fore.CYAN + f"\nBatch {batch_id} completed: {success_count} files renamed")
-    print(Fore.CYAN + f"Log saved to {log_path}\n")
+                if e is None:
+                    # Log successful rename with absolute paths (already absolute in the plan)
+                    log.writerow([batch_id, timestamp, src, target_dst, "rename"])
+                    lines.append(f"  {os.path.basename(src)} → {C_GREEN}{os.path.basename(target_dst)}{C_RESET}\n")
+                    success_count += 1
+                else:
+                    # Log error if rename fails
+                    log.writerow([batch_id, timestamp, src, target_dst, f"error:{e}"])
+                    lines.append(C_RED + f"Error renaming {os.path.basename(src)}: {e}{C_RESET}\n")
+                logged += 1
+        finally:
+            # On interrupt: cancel queued renames, wait for running ones, and log
+            # those that reached the disk so rollback can still undo them
+            results.close()
+            for fd in dir_fds.values():
+                os.close(fd)
+            for src, target_dst in jobs[logged:]:
+                if os.path.lexists(target_dst) and not os.path.lexists(src):
+                    log.writerow([batch_id, timestamp, src, target_dst, "rename"])
+                    lines.append(f"  {os.path.basename(src)} → {C_GREEN}{os.path.basename(target_dst)}{C_RESET}\n")
+            # Show every rename already done, even when interrupted
+            flush_lines(lines)
+
+    print(C_CYAN + f"\nBatch {batch_id} completed: {success_count} files renamed")
+    print(C_CYAN + f"Log saved to {log_path}\n")
 
 
-def read_log_csv(log_path: Path) -> List[Dict[str, str]]:
+def read_log_csv(log_path: Path, batch_id: str) -> List[Dict[str, str]]:
     """
-    Read entire CSV log into list of dictionaries.
+    Read the rename entries of one batch from the CSV log.
+    Streams the file and keeps only matching rows instead of loading the
+    whole log into memory.
     
     Args:
         log_path: Path to log file
+        batch_id: Batch whose rename entries to return
     Returns:
-        List of dict rows with header as keys
+        List of dict rows with header as keys, in log order
     """
     # Return empty list if log doesn't exist
     if not log_path.exists():
         return []
     
-    # Read CSV with UTF-8-BOM encoding
+    # Read CSV with UTF-8-BOM encoding; ids can repeat later in the log
+    # (same-second batches, rollback rows), so scan to the end
     with log_path.open("r", newline="", encoding="utf-8-sig") as f:
-        return list(csv.DictReader(f))
+        return [row for row in csv.DictReader(f)
+                if row.get("batch_id") == batch_id and row.get("action") == "rename"]
+
 
 def clear_logs(root: Path) -> None:
     """
@@ -331,49 +756,64 @@ def clear_logs(root: Path) -> None:
     """
     logs = list(root.rglob("rename_log.csv"))
     if not logs:
-        print(Fore.YELLOW + "No rename_log.csv files found.\n")
+        print(C_YELLOW + "No rename_log.csv files found.\n")
         return
 
-    print(Fore.CYAN + f"Found {len(logs)} log file(s). Deleting...\n")
+    print(C_CYAN + f"Found {len(logs)} log file(s). Deleting...\n")
     deleted = 0
 
     for log in logs:
         try:
+            # Release our own handle first (Windows cannot delete open files)
+            close_log(log)
             log.unlink()
-            print(Fore.GREEN + f"✓ Deleted: {log}")
+            print(C_GREEN + f"✓ Deleted: {log}")
             deleted += 1
         except Exception as e:
-            print(Fore.RED + f"✗ Failed to delete {log}: {e}")
+            print(C_RED + f"✗ Failed to delete {log}: {e}")
 
-    print(Fore.CYAN + f"Clear complete: {deleted}/{len(logs)} logs removed.\n")
+    print(C_CYAN + f"Clear complete: {deleted}/{len(logs)} logs removed.\n")
 
 
-def find_last_batch(log_rows: List[Dict[str, str]]) -> str | None:
+def find_last_batch(log_path: Path) -> str | None:
     """
     Find the most recent batch_id with actual rename actions.
+    Scans the memory-mapped log backwards record by record and stops at the
+    first rename row, so only the tail of a long log is touched.
     
     Args:
-        log_rows: List of log entries
+        log_path: Path to log file
     Returns:
         Last batch_id or None if no batches found
     """
-    # Return None if no log entries
-    if not log_rows:
+    # Return None if there is no log (mmap cannot map an empty file)
+    if not log_path.exists() or log_path.stat().st_size == 0:
         return None
     
-    # Search from end to find last rename batch
-    batch_ids = []
-    for row in reversed(log_rows):
-        action = row.get("action", "")
-        batch_id = row.get("batch_id", "")
-        
-        # Only consider rename actions (not rollback)
-        # Add batch_id if not already in list
-        if action == "rename" and batch_id and batch_id not in batch_ids:
-            batch_ids.append(batch_id)
+    with log_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = record_end = len(mm)
+        quotes = 0
+        # Walk physical lines from the end of the file
+        while end > 0:
+            start = mm.rfind(b"\n", 0, end - 1) + 1
+            quotes += mm[start:end].count(b'"')
+            end = start
+            
+            # Quoted paths may hold newlines: a line starts a record only if
+            # an even number of quotes follows it (i.e. it is outside quotes)
+            if quotes % 2:
+                continue
+            record = mm[start:record_end]
+            record_end = start
+            
+            # Only consider rename actions (not rollback); action is the last
+            # column and never quoted, so check it before parsing the record
+            if record.rstrip(b"\r\n").endswith(b",rename"):
+                row = next(csv.reader(io.StringIO(record.decode("utf-8-sig", "replace"))))
+                if row[0].isdigit():
+                    return row[0]
     
-    # Return first (most recent) batch or None
-    return batch_ids[0] if batch_ids else None
+    return None
 
 
 def rollback_last_batch(root: Path) -> None:
@@ -385,79 +825,89 @@ def rollback_last_batch(root: Path) -> None:
         root: Root directory containing rename_log.csv
     """
     log_path = root / "rename_log.csv"
-    rows = read_log_csv(log_path)
     
     # Check if log exists
-    if not rows:
-        print(Fore.YELLOW + "No log found to rollback.\n")
+    if not log_path.exists():
+        print(C_YELLOW + "No log found to rollback.\n")
         return
     
     # Find last batch ID
-    last_batch = find_last_batch(rows)
+    last_batch = find_last_batch(log_path)
     if not last_batch:
-        print(Fore.YELLOW + "No batch id found in log.\n")
+        print(C_YELLOW + "No batch id found in log.\n")
         return
 
-    # Filter rows: only this batch and only rename actions
-    batch_rows = [r for r in rows if r.get("batch_id") == last_batch and r.get("action") == "rename"]
+    # Read only this batch's rename rows
+    batch_rows = read_log_csv(log_path, last_batch)
     
     # Check if batch has any rename operations
     if not batch_rows:
-        print(Fore.YELLOW + "No rename entries found for the last batch.\n")
+        print(C_YELLOW + "No rename entries found for the last batch.\n")
         return
     
-    print(Fore.CYAN + f"Rolling back batch {last_batch} ({len(batch_rows)} files)...\n")
+    print(C_CYAN + f"Rolling back batch {last_batch} ({len(batch_rows)} files)...\n")
     
-    rollback_actions = []
     success_count = 0
+    lines: List[str] = []
     
-    # Process in reverse order (last renamed first)
-    for entry in reversed(batch_rows):
-        src_str = entry.get("src", "")
-        dst_str = entry.get("dst", "")
-        
-        # Convert string paths back to Path objects
-        src = Path(src_str)
-        dst = Path(dst_str)
-        
-        # Check if renamed file (destination) still exists
-        if not dst.exists():
-            rollback_actions.append([last_batch, datetime.now().isoformat(), dst_str, src_str, "rollback_missing_dst"])
-            print(Fore.YELLOW + f"Cannot rollback {dst.name}: file not found")
-            continue
+    # Entry names per directory, listed once on the first occupied original path
+    dir_names: Dict[Path, set] = {}
+    
+    # Process in reverse order (last renamed first), logging each operation as it completes
+    with open_log(log_path) as log:
+        try:
+            for entry in reversed(batch_rows):
+                if len(lines) >= PRINT_BATCH:
+                    flush_lines(lines)
 
-        final_src = src
-        
-        # Check if original path is now occupied by another file
-        if final_src.exists():
-            base, ext = src.stem, src.suffix
-            i = 1
-            
-            # Find alternative name: original_restored_1, _2, etc.
-            while True:
-                candidate = src.with_name(f"{base}_restored_{i}{ext}")
-                # Break when unique name found
-                if not candidate.exists():
-                    final_src = candidate
-                    break
-                i += 1
-            
-            print(Fore.YELLOW + f"Original path occupied — restoring to {final_src.name}")
+                src_str = entry.get("src", "")
+                dst_str = entry.get("dst", "")
 
-        # Attempt to move file back to original (or alternative) name
-        try:
-            shutil.move(str(dst), str(final_src))
-            rollback_actions.append([last_batch, datetime.now().isoformat(), dst_str, str(final_src.resolve()), "rollback"])
-            print(Fore.GREEN + f"✓ Rolled back: {dst.name} → {final_src.name}")
-            success_count += 1
-        except Exception as e:
-            rollback_actions.append([last_batch, datetime.now().isoformat(), dst_str, str(final_src.resolve()), f"rollback_failed:{e}"])
-            print(Fore.RED + f"✗ Failed to rollback {dst.name}: {e}")
+                # Convert string paths back to Path objects
+                src = Path(src_str)
+                dst = Path(dst_str)
+
+                # Check if renamed file (destination) still exists
+                if not dst.exists():
+                    log.writerow([last_batch, datetime.now().isoformat(), dst_str, src_str, "rollback_missing_dst"])
+                    lines.append(C_YELLOW + f"Cannot rollback {dst.name}: file not found{C_RESET}\n")
+                    continue
+
+                final_src = src
+
+                # Check if original path is now occupied by another file
+                if final_src.exists():
+                    base, ext = src.stem, src.suffix
+                    if src.parent not in dir_names:
+                        dir_names[src.parent] = list_dir_names(src.parent)
+                    names = dir_names[src.parent]
+
+                    # Find alternative name: original_restored_1, _2, etc.
+                    i = 1
+                    while f"{base}_restored_{i}{ext}".casefold() in names:
+                        i += 1
+                    final_src = src.with_name(f"{base}_restored_{i}{ext}")
+
+                    lines.append(C_YELLOW + f"Original path occupied — restoring to {final_src.name}{C_RESET}\n")
+
+                # Attempt to move file back to original (or alternative) name
+                try:
+                    shutil.move(str(dst), str(final_src))
+                    # Keep the cached listing current for later collisions in this folder
+                    if final_src.parent in dir_names:
+                        dir_names[final_src.parent].add(final_src.name.casefold())
+                    log.writerow([last_batch, datetime.now().isoformat(), dst_str, str(final_src), "rollback"])
+                    lines.append(C_GREEN + f"✓ Rolled back: {dst.name} → {final_src.name}{C_RESET}\n")
+                    success_count += 1
+                except Exception as e:
+                    log.writerow([last_batch, datetime.now().isoformat(), dst_str, str(final_src), f"rollback_failed:{e}"])
+                    lines.append(C_RED + f"✗ Failed to rollback {dst.name}: {e}{C_RESET}\n")
+        finally:
+            # Show every restore already done, even when interrupted
+            flush_lines(lines)
 
-    # Log all rollback operations
-    append_log_csv(log_path, rollback_actions)
-    print(Fore.CYAN + f"\nRollback complete: {success_count}/{len(batch_rows)} files restored")
-    print(Fore.CYAN + f"Rollback logged to {log_path}\n")
+    print(C_CYAN + f"\nRollback complete: {success_count}/{len(batch_rows)} files restored")
+    print(C_CYAN + f"Rollback logged to {log_path}\n")
 
 # ---------------------------
 # Interactive CLI
@@ -487,7 +937,7 @@ def interactive_loop() -> None:
     # Main loop: read and process commands until quit
     while True:
         try:
-            cmdline = input(Fore.BLUE + "reChronos@root# " + Style.RESET_ALL).strip()
+            cmdline = input(C_BLUE + "reChronos@root# " + C_RESET).strip()
         except (KeyboardInterrupt, EOFError):
             print("\nExiting.")
             break
@@ -518,7 +968,7 @@ def interactive_loop() -> None:
             
             # Validate directory exists
             if not target.exists() or not target.is_dir():
-                print(Fore.RED + f"Invalid directory: {target}")
+                print(C_RED + f"Invalid directory: {target}")
                 continue
             
             # Build and show plan
@@ -533,7 +983,7 @@ def interactive_loop() -> None:
             
             # Validate directory exists
             if not target.is_dir():
-                print(Fore.RED + f"Invalid directory: {target}")
+                print(C_RED + f"Invalid directory: {target}")
                 continue
             
             # Build plan
@@ -541,20 +991,20 @@ def interactive_loop() -> None:
             
             # Check if any files to rename
             if not plan:
-                print(Fore.YELLOW + "No files to rename.\n")
+                print(C_YELLOW + "No files to rename.\n")
                 continue
             
             # Show preview
             preview_plan(plan)
             
             # Ask for confirmation
-            confirm = input(Fore.MAGENTA + "Proceed with rename? (yes/no): " + Style.RESET_ALL).strip().lower()
+            confirm = input(C_MAGENTA + "Proceed with rename? (yes/no): " + C_RESET).strip().lower()
             
             # Execute if confirmed
             if confirm in ("y", "yes"):
                 perform_rename(target, plan)
             else:
-                print(Fore.CYAN + "Rename canceled by user.\n")
+                print(C_CYAN + "Rename canceled by user.\n")
             continue
 
         # Command: rollback last batch
@@ -564,17 +1014,17 @@ def interactive_loop() -> None:
             
             # Validate directory exists
             if not target.exists() or not target.is_dir():
-                print(Fore.RED + f"Invalid directory: {target}")
+                print(C_RED + f"Invalid directory: {target}")
                 continue
             
             # Ask for confirmation
-            confirm = input(Fore.MAGENTA + f"Rollback last batch in {target}? (yes/no): " + Style.RESET_ALL).strip().lower()
+            confirm = input(C_MAGENTA + f"Rollback last batch in {target}? (yes/no): " + C_RESET).strip().lower()
             
             # Execute if confirmed
             if confirm in ("y", "yes"):
                 rollback_last_batch(target)
             else:
-                print(Fore.CYAN + "Rollback canceled.\n")
+                print(C_CYAN + "Rollback canceled.\n")
             continue
 
         # Command: show help
@@ -592,19 +1042,19 @@ def interactive_loop() -> None:
             target = Path(args[0]).expanduser().resolve() if args else Path.cwd()
             
             if not target.exists() or not target.is_dir():
-                print(Fore.RED + f"Invalid directory: {target}")
+                print(C_RED + f"Invalid directory: {target}")
                 continue
             
-            confirm = input(Fore.MAGENTA + f"Delete all rename_log.csv under {target}? (yes/no): " + Style.RESET_ALL).strip().lower()
+            confirm = input(C_MAGENTA + f"Delete all rename_log.csv under {target}? (yes/no): " + C_RESET).strip().lower()
             if confirm in ("y", "yes"):
                 clear_logs(target)
             else:
-                print(Fore.CYAN + "Clear canceled.\n")
+                print(C_CYAN + "Clear canceled.\n")
             continue
 
 
         # Unknown command
-        print(Fore.RED + f"Unknown command: {cmd}. Type 'help' to see available commands.")
+        print(C_RED + f"Unknown command: {cmd}. Type 'help' to see available commands.")
 
 
 if __name__ == "__main__":
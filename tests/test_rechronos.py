@@ -0,0 +1,226 @@
+"""Regression tests for reChronos core helpers."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import rechronos  # noqa: E402
+
+
+def test_make_new_name_counters_per_extension():
+    # "FILE_<stamp>" (no extension) and "FILE_<stamp>.file" share a base
+    existing = {"FILE_240102_0105PM", "FILE_240102_0105PM.file"}
+    next_index = {}
+    names = [rechronos.make_new_name(suffix, "240102_0105PM", existing, next_index)
+             for suffix in ["", "", ".file", ".file"]]
+    assert names == [
+        "FILE_240102_0105PM_1",
+        "FILE_240102_0105PM_2",
+        "FILE_240102_0105PM_1.file",
+        "FILE_240102_0105PM_2.file",
+    ]
+
+
+def make_symlink_loop(directory):
+    try:
+        (directory / "loop").symlink_to("loop")
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not available")
+
+
+def test_gather_keeps_folder_entries_after_symlink_loop(tmp_path):
+    for i in range(30):
+        (tmp_path / f"f{i}.jpg").write_text(str(i))
+    make_symlink_loop(tmp_path)
+
+    files, _ = rechronos.gather_files_recursive(tmp_path)
+
+    assert len(files) == 30
+
+
+def test_plan_survives_listing_error_midway(tmp_path, monkeypatch):
+    for i in range(5):
+        (tmp_path / f"f{i}.jpg").write_text(str(i))
+    real_scandir = rechronos.os.scandir
+
+    class FailingListing:
+        """Yields two real entries, then fails like a listing cut short."""
+
+        def __init__(self, path):
+            self.listing = real_scandir(path)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.listing.close()
+
+        def __iter__(self):
+            for i, entry in enumerate(self.listing):
+                if i == 2:
+                    raise OSError("listing interrupted")
+                yield entry
+
+    monkeypatch.setattr(rechronos.os, "scandir", FailingListing)
+    plan = rechronos.build_rename_plan(tmp_path)
+
+    assert len(plan) == 2
+
+
+def test_plan_with_symlink_loop(tmp_path):
+    for i in range(30):
+        (tmp_path / f"f{i}.jpg").write_text(str(i))
+    make_symlink_loop(tmp_path)
+
+    plan = rechronos.build_rename_plan(tmp_path)
+
+    assert len(plan) == 30
+    assert len({dst for _, dst in plan}) == 30
+
+
+def test_find_last_batch_with_quoted_paths(tmp_path):
+    log_path = tmp_path / "rename_log.csv"
+    odd = [str(tmp_path / 'a "quoted", name.jpg'), str(tmp_path / "line\nbreak.jpg")]
+    # A path that looks like a later rename row once split on newlines
+    fake = str(tmp_path / 'x\n2020,t,"a",b,rename')
+    with rechronos.open_log(log_path) as log:
+        for src in odd:
+            log.writerow(["1000", "t", src, src + ".new", "rename"])
+        log.writerow(["1001", "t", fake, fake + ".new", "error:boom"])
+        log.writerow(["1002", "t", odd[1] + ".new", fake, "rollback"])
+
+    assert rechronos.find_last_batch(log_path) == "1000"
+    rows = rechronos.read_log_csv(log_path, "1000")
+    assert [row["src"] for row in rows] == odd
+
+
+def test_find_last_batch_picks_latest_rename(tmp_path):
+    log_path = tmp_path / "rename_log.csv"
+    with rechronos.open_log(log_path) as log:
+        log.writerow(["1000", "t", "a", "b", "rename"])
+        log.writerow(["1001", "t", "c\n1000,t", 'd",e', "rename"])
+
+    assert rechronos.find_last_batch(log_path) == "1001"
+
+
+@pytest.mark.parametrize("count", [10, 200])
+def test_interrupted_rename_logs_what_happened(tmp_path, monkeypatch, capsys, count):
+    for i in range(count):
+        (tmp_path / f"f{i}.jpg").write_text(str(i))
+    plan = rechronos.build_rename_plan(tmp_path)
+    real_try_rename = rechronos.try_rename
+    calls = []
+
+    def interrupted_rename(src, dst, dir_fd=None):
+        calls.append(src)
+        if len(calls) == count // 2:
+            raise KeyboardInterrupt
+        return real_try_rename(src, dst, dir_fd)
+
+    monkeypatch.setattr(rechronos, "try_rename", interrupted_rename)
+    with pytest.raises(KeyboardInterrupt):
+        rechronos.perform_rename(tmp_path, plan)
+    rechronos.close_all_logs()
+
+    renamed = {src for src, dst in plan if Path(dst).exists() and not Path(src).exists()}
+    batch_id = rechronos.find_last_batch(tmp_path / "rename_log.csv")
+    rows = rechronos.read_log_csv(tmp_path / "rename_log.csv", batch_id)
+    assert renamed
+    assert sorted(row["src"] for row in rows) == sorted(renamed)
+    assert capsys.readouterr().out.count(" → ") == len(renamed)
+
+
+def test_open_log_closes_descriptor_when_not_kept(tmp_path, monkeypatch):
+    log_path = tmp_path / "rename_log.csv"
+    monkeypatch.setattr(rechronos, "KEEP_LOG_OPEN", False)
+    with rechronos.open_log(log_path) as log:
+        log.writerow(["1000", "t", "a", "b", "rename"])
+
+    assert log_path not in rechronos.LOG_FDS
+    assert rechronos.find_last_batch(log_path) == "1000"
+
+
+def test_open_dir_fds_caps_held_descriptors(tmp_path):
+    folders = []
+    for i in range(200):
+        (tmp_path / f"d{i}").mkdir()
+        folders += [str(tmp_path / f"d{i}")] * (2 if i == 150 else 1)
+
+    fds = rechronos.open_dir_fds(folders)
+    try:
+        assert len(fds) <= rechronos.DIR_FD_LIMIT
+        if fds:
+            assert str(tmp_path / "d150") in fds
+    finally:
+        for fd in fds.values():
+            os.close(fd)
+
+
+def test_conflict_suffix_skips_case_variant_occupant(tmp_path):
+    src = tmp_path / "a.jpg"
+    src.write_text("new")
+    (tmp_path / "JPG_x.jpg").write_text("taken")
+    # On a case-insensitive volume this is the same file as JPG_x_1.jpg
+    (tmp_path / "JPG_x_1.JPG").write_text("keep")
+
+    rechronos.perform_rename(tmp_path, [(str(src), str(tmp_path / "JPG_x.jpg"))])
+    rechronos.close_all_logs()
+
+    assert (tmp_path / "JPG_x_2.jpg").read_text() == "new"
+    assert (tmp_path / "JPG_x_1.JPG").read_text() == "keep"
+
+
+def test_rollback_suffix_skips_case_variant_occupant(tmp_path):
+    src = tmp_path / "a.jpg"
+    src.write_text("orig")
+    rechronos.perform_rename(tmp_path, [(str(src), str(tmp_path / "JPG_x.jpg"))])
+    src.write_text("occupant")
+    (tmp_path / "A_restored_1.JPG").write_text("keep")
+
+    rechronos.rollback_last_batch(tmp_path)
+    rechronos.close_all_logs()
+
+    assert (tmp_path / "a_restored_2.jpg").read_text() == "orig"
+    assert (tmp_path / "A_restored_1.JPG").read_text() == "keep"
+
+
+@pytest.mark.parametrize("name", [
+    "a.jpg", "..jpg", "...jpg", ".jpg", ".hidden", "a.", "a..", "noext", "a.tar.gz", ".a.b",
+])
+def test_name_suffix_matches_path_suffix(name):
+    assert rechronos.name_suffix(name) == Path(name).suffix
+
+
+def test_plan_keeps_suffix_of_dot_leading_names(tmp_path):
+    (tmp_path / "..jpg").write_text("x")
+    (tmp_path / "...png").write_text("y")
+
+    plan = rechronos.build_rename_plan(tmp_path)
+
+    assert sorted(os.path.basename(dst).split("_")[0] for _, dst in plan) == ["JPG", "PNG"]
+
+
+def test_interrupted_rollback_prints_what_happened(tmp_path, monkeypatch, capsys):
+    for i in range(10):
+        (tmp_path / f"f{i}.jpg").write_text(str(i))
+    rechronos.perform_rename(tmp_path, rechronos.build_rename_plan(tmp_path))
+    real_move = rechronos.shutil.move
+    calls = []
+
+    def interrupted_move(src, dst):
+        calls.append(src)
+        if len(calls) == 5:
+            raise KeyboardInterrupt
+        return real_move(src, dst)
+
+    monkeypatch.setattr(rechronos.shutil, "move", interrupted_move)
+    capsys.readouterr()
+    with pytest.raises(KeyboardInterrupt):
+        rechronos.rollback_last_batch(tmp_path)
+    rechronos.close_all_logs()
+
+    assert capsys.readouterr().out.count("Rolled back") == 4